@@ -0,0 +1,285 @@
+"""
+Load test: legitimate QR check-in latency while the endpoint is flooded.
+
+Starts the app under gunicorn (``gunicorn.conf.py``, throwaway SQLite
+database) and measures sequential check-ins from legitimate members, each on
+their own phone: first on a quiet server, then while attacker processes
+hammer ``/api/attendance/mark/`` with random suffixes as fast as the server
+answers. During the flood every 5th member checks in over the gym wifi,
+sharing its IP with a kiosk stuck in a retry loop. Run it again with
+``--no-throttle`` for the same flood against the unprotected view.
+
+    python benchmarks/checkin_flood.py
+    python benchmarks/checkin_flood.py --no-throttle   # control run
+    python benchmarks/checkin_flood.py --attackers 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URL = "/api/attendance/mark/"
+GYM_WIFI_IP = "100.64.200.1"
+
+SETTINGS = """\
+from gym_backend.settings import *
+
+DATABASES = {{"default": {{"ENGINE": "django.db.backends.sqlite3", "NAME": {db!r}}}}}
+# Check-ins are only accepted 5 AM - 11 PM; use a zone where it is now ~noon
+TIME_ZONE = {tz!r}
+"""
+
+UNTHROTTLED_URLS = """\
+from django.urls import include, path
+
+import core.views
+from core.views import MarkAttendanceView
+
+core.views.client_locked_out = lambda request: False
+core.views.record_failed_lookup = lambda request: None
+
+
+class UnthrottledMarkAttendanceView(MarkAttendanceView):
+    throttle_classes = []
+
+
+urlpatterns = [
+    path("api/attendance/mark/", UnthrottledMarkAttendanceView.as_view()),
+    path("", include("gym_backend.urls")),
+]
+"""
+
+
+def noon_time_zone():
+    # Etc/GMT signs are inverted: Etc/GMT-5 is UTC+5
+    offset = 12 - datetime.now(dt_timezone.utc).hour
+    return "Etc/GMT" if offset == 0 else f"Etc/GMT{-offset:+d}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def check_in(port, last_4, ip, device):
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request(
+            "POST",
+            URL,
+            body=json.dumps({"last_4_digits": last_4}),
+            headers={
+                "Content-Type": "application/json",
+                "X-Forwarded-For": ip,
+                "X-Device-Id": device,
+            },
+        )
+        status = conn.getresponse().status
+    except OSError:
+        status = "error"
+    finally:
+        conn.close()
+    return status, time.perf_counter() - started
+
+
+def legit_run(port, member_ids, phase, gym_wifi_every=0):
+    latencies, statuses = [], Counter()
+    for n, i in enumerate(member_ids):
+        on_gym_wifi = gym_wifi_every and n % gym_wifi_every == 0
+        ip = GYM_WIFI_IP if on_gym_wifi else f"100.64.{i // 250}.{i % 250}"
+        status, seconds = check_in(port, f"{i:04d}", ip, f"{phase}-phone-{i}")
+        # 200 = attendance already marked, e.g. an attacker guessed the suffix
+        statuses[status] += 1
+        latencies.append(seconds)
+        time.sleep(0.01)
+    return latencies, statuses
+
+
+def attacker(port, ip, stop, results, device=None):
+    # Without a fixed device, a new device id per request
+    statuses = Counter()
+    n = 0
+    while not stop.is_set():
+        status, _ = check_in(
+            port, f"{random.randrange(10_000):04d}", ip, device or f"bot-{n}"
+        )
+        statuses[status] += 1
+        n += 1
+    results.put(dict(statuses))
+
+
+def summary(latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return (
+        f"p50 {statistics.median(ordered) * 1000:6.2f} ms   "
+        f"p95 {p95 * 1000:6.2f} ms   max {ordered[-1] * 1000:6.2f} ms"
+    )
+
+
+def prepare(tmp, members, no_throttle):
+    with open(os.path.join(tmp, "flood_settings.py"), "w") as f:
+        f.write(SETTINGS.format(db=os.path.join(tmp, "flood.sqlite3"), tz=noon_time_zone()))
+        if no_throttle:
+            f.write('ROOT_URLCONF = "flood_urls"\n')
+    with open(os.path.join(tmp, "flood_urls.py"), "w") as f:
+        f.write(UNTHROTTLED_URLS)
+
+    os.environ["PYTHONPATH"] = os.pathsep.join([tmp, BASE_DIR])
+    os.environ["DJANGO_SETTINGS_MODULE"] = "flood_settings"
+    # Clients are simulated with X-Forwarded-For, as if behind one proxy
+    os.environ["NUM_PROXIES"] = "1"
+    sys.path[:0] = [tmp, BASE_DIR]
+
+    import django
+
+    django.setup()
+
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from core.models import GymConfig, Member
+
+    call_command("migrate", verbosity=0)
+    today = timezone.localdate()
+    GymConfig.objects.create(qr_active=True)
+    Member.objects.bulk_create(
+        Member(
+            name=f"Member {i}",
+            phone=f"98{i:08d}",
+            start_date=today,
+            end_date=today + timedelta(days=30),
+        )
+        for i in range(members)
+    )
+
+
+def probe_queries():
+    # Drain one IP's bucket in-process and count queries on the next request
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+    for n in range(200):
+        client.post(
+            URL,
+            {"last_4_digits": "9999"},
+            content_type="application/json",
+            HTTP_X_FORWARDED_FOR="198.51.100.1",
+            HTTP_X_DEVICE_ID=f"probe-{n}",
+        )
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            URL,
+            {"last_4_digits": "9998"},
+            content_type="application/json",
+            HTTP_X_FORWARDED_FOR="198.51.100.1",
+            HTTP_X_DEVICE_ID="probe",
+        )
+    return response.status_code, len(queries.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=400)
+    parser.add_argument("--attackers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--no-throttle", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare(tmp, args.members, args.no_throttle)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "gym_backend.wsgi"],
+            cwd=BASE_DIR,
+            env=dict(os.environ, PORT=str(port)),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                if check_in(port, "0000", "127.0.0.1", "ready")[0] != "error":
+                    break
+                time.sleep(0.1)
+
+            half = args.members // 2
+            quiet, quiet_statuses = legit_run(port, range(1, half), "quiet")
+
+            stop = multiprocessing.Event()
+            results = multiprocessing.Queue()
+            attackers = [
+                multiprocessing.Process(
+                    target=attacker, args=(port, f"203.0.113.{n}", stop, results)
+                )
+                for n in range(args.attackers)
+            ]
+            attackers.append(multiprocessing.Process(
+                target=attacker, args=(port, GYM_WIFI_IP, stop, results, "kiosk")
+            ))
+            for process in attackers:
+                process.start()
+            started = time.perf_counter()
+            try:
+                time.sleep(0.5)  # let the flood build up
+                flooded, flooded_statuses = legit_run(
+                    port, range(half, args.members), "flood", gym_wifi_every=5
+                )
+                remaining = args.duration - (time.perf_counter() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+            finally:
+                stop.set()
+                statuses = Counter()
+                for _ in attackers:
+                    statuses.update(results.get())
+                for process in attackers:
+                    process.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+        probe = None if args.no_throttle else probe_queries()
+
+    total = sum(statuses.values())
+    print(f"throttle {'OFF' if args.no_throttle else 'ON'}\n")
+    for name, latencies, legit in (
+        ("quiet  ", quiet, quiet_statuses),
+        ("flooded", flooded, flooded_statuses),
+    ):
+        rejected = len(latencies) - legit[200] - legit[201]
+        print(
+            f"legit check-ins, {name} ({len(latencies):4d})   {summary(latencies)}"
+            f"   not checked in: {rejected}"
+        )
+    print(
+        f"\nflood: {args.attackers} attacker processes + 1 stuck kiosk on the "
+        f"gym wifi, {total} requests "
+        f"in {elapsed:.1f}s ({total / elapsed:.0f} req/s)"
+    )
+    for code, count in sorted(statuses.items(), key=str):
+        print(f"  HTTP {code}: {count:6d}  ({count / total:6.1%})")
+    if probe:
+        print(f"\nthrottled request: HTTP {probe[0]}, {probe[1]} DB queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Cold-start benchmark: time-to-first-response of the WSGI app.
+
+Each run starts a fresh interpreter, imports the stack step by step, then
+sends one request straight to the WSGI callable (no network, no database)
+and a second one to show the warm cost. Median step times are reported,
+followed by an import-time breakdown per top-level package taken from
+``python -X importtime``.
+
+    python benchmarks/startup.py              # table
+    python benchmarks/startup.py --warmup     # prime like the gunicorn master
+    python benchmarks/startup.py --json       # one line, for tracking per commit
+"""
+
+import argparse
+import collections
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUEST_PATH = "/api/members/"  # unauthenticated -> 401, never touches the DB
+
+STEPS = [
+    ("interpreter", "python start-up until this script runs"),
+    ("settings", "import gym_backend.settings"),
+    ("django_setup", "gym_backend.wsgi: django.setup() + middleware"),
+    ("drf", "rest_framework views/generics"),
+    ("simplejwt", "rest_framework_simplejwt auth + views"),
+    ("core", "core.views + core.urls"),
+    ("warmup", "core.warmup.warm_up(database=False)"),
+    ("first_response", "first request through the WSGI app"),
+    ("second_response", "same request again, warm"),
+]
+
+
+def record_all_imports():
+    # -X importtime only sees imports made through __import__ (the import
+    # statement), not importlib.import_module(), which Django uses to load
+    # settings, apps and URLconfs. Route it through __import__ so
+    # gym_backend.* and core.* show up in the breakdown.
+    import importlib
+    import importlib.util
+
+    def import_module(name, package=None):
+        if name.startswith("."):
+            name = importlib.util.resolve_name(name, package)
+        __import__(name)
+        return sys.modules[name]
+
+    importlib.import_module = import_module
+
+
+def child(warmup, importtime):
+    timings = {"interpreter": time.time() - float(os.environ["STARTUP_SPAWNED_AT"])}
+    if importtime:
+        record_all_imports()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gym_backend.settings")
+    sys.path.insert(0, BASE_DIR)
+
+    def timed(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - started
+        return result
+
+    def request():
+        from io import BytesIO
+
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": REQUEST_PATH,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.input": BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+        b"".join(application(environ, lambda status, headers: None))
+
+    import importlib
+
+    timed("settings", lambda: importlib.import_module("gym_backend.settings"))
+    application = timed(
+        "django_setup",
+        lambda: importlib.import_module("gym_backend.wsgi").application,
+    )
+    timed("drf", lambda: [
+        importlib.import_module(m)
+        for m in ("rest_framework.views", "rest_framework.generics")
+    ])
+    timed("simplejwt", lambda: [
+        importlib.import_module(m)
+        for m in (
+            "rest_framework_simplejwt.authentication",
+            "rest_framework_simplejwt.views",
+        )
+    ])
+    timed("core", lambda: [
+        importlib.import_module(m) for m in ("core.views", "core.urls")
+    ])
+    if warmup:
+        from core.warmup import warm_up
+
+        timed("warmup", lambda: warm_up(database=False))
+    timed("first_response", request)
+    timed("second_response", request)
+
+    print(json.dumps(timings))
+
+
+def spawn(warmup, importtime=False):
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += [os.path.abspath(__file__), "--child"]
+    if warmup:
+        args.append("--warmup")
+    if importtime:
+        args.append("--importtime")
+    env = dict(os.environ, STARTUP_SPAWNED_AT=repr(time.time()))
+    proc = subprocess.run(
+        args, cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+# Always reported, however small, so they can be tracked between commits
+TRACKED_PACKAGES = (
+    "gym_backend",
+    "core",
+    "django",
+    "rest_framework",
+    "rest_framework_simplejwt",
+)
+
+
+def import_breakdown(stderr, top=8):
+    """
+    Self-time per top-level package: the tracked packages, then the ``top``
+    largest others, then ``rest_framework`` split by submodule.
+    """
+    # "import time: self [us] | cumulative | imported package" lines
+    per_package = collections.Counter()
+    drf_modules = collections.Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        parts = name.strip().split(".")
+        per_package[parts[0]] += int(self_us)
+        if parts[0] == "rest_framework":
+            drf_modules[".".join(parts[:2])] += int(self_us)
+
+    tracked = {name: per_package[name] / 1000 for name in TRACKED_PACKAGES}
+    others = {
+        name: us / 1000
+        for name, us in per_package.most_common()
+        if name not in tracked
+    }
+    return {
+        "tracked": tracked,
+        "others": dict(list(others.items())[:top]),
+        "rest_framework": {
+            name: us / 1000 for name, us in drf_modules.most_common(top)
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--importtime", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.warmup, args.importtime)
+
+    runs = [spawn(args.warmup)[0] for _ in range(args.runs)]
+    medians = {
+        name: statistics.median(run[name] for run in runs) * 1000
+        for name, _ in STEPS
+        if name in runs[0]
+    }
+    first_response_ms = sum(v for k, v in medians.items() if k != "second_response")
+    packages = import_breakdown(spawn(args.warmup, importtime=True)[1])
+
+    if args.json:
+        print(json.dumps({
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            "warmup": args.warmup,
+            "time_to_first_response_ms": round(first_response_ms, 1),
+            "steps_ms": {k: round(v, 1) for k, v in medians.items()},
+            "import_self_ms": {
+                group: {k: round(v, 1) for k, v in values.items()}
+                for group, values in packages.items()
+            },
+        }))
+        return
+
+    print(f"median of {args.runs} fresh processes (GET {REQUEST_PATH})\n")
+    for name, description in STEPS:
+        if name in medians:
+            print(f"  {name:<16} {medians[name]:8.1f} ms   {description}")
+    print(f"\n  {'time to first response':<24} {first_response_ms:8.1f} ms\n")
+    print("import self-time (-X importtime, one run)")
+    for title, group in (
+        ("tracked packages", "tracked"),
+        ("largest other packages", "others"),
+        ("rest_framework by submodule", "rest_framework"),
+    ):
+        print(f"\n  {title}")
+        for name, ms in packages[group].items():
+            print(f"    {name:<34} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,166 @@
+from datetime import date, timedelta
+
 from django.contrib import admin
-from .models import Member, Attendance, Payment, GymConfig
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import (
+    Member,
+    Attendance,
+    Payment,
+    GymConfig,
+    MemberEngagement,
+    ArchiveSweep,
+)
+from .utils import renewal_end_date
+
+
+class EstimatedCountPaginator(Paginator):
+    # On big unfiltered Postgres tables, use the planner's row estimate
+    # instead of a full COUNT(*); small or filtered querysets count exactly
+    EXACT_COUNT_BELOW = 100_000
+
+    @cached_property
+    def count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor == "postgresql" and not self.object_list.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.EXACT_COUNT_BELOW:
+                return row[0]
+        return super().count
+
+
+class DateRangeQuerySet(QuerySet):
+    # date_hierarchy lists its choices with a DISTINCT over a truncation of
+    # every row; derive them from the first and last date (two index
+    # lookups) instead
+    def dates(self, field_name, kind, order="ASC"):
+        if kind not in ("year", "month", "day"):
+            return super().dates(field_name, kind, order)
+
+        values = self.order_by().values_list(field_name, flat=True)
+        first = values.order_by(field_name).first()
+        last = values.order_by(f"-{field_name}").first()
+        if first is None:
+            return []
+
+        if kind == "year":
+            dates = [date(year, 1, 1) for year in range(first.year, last.year + 1)]
+        elif kind == "month":
+            months = range(first.year * 12 + first.month - 1, last.year * 12 + last.month)
+            dates = [date(m // 12, m % 12 + 1, 1) for m in months]
+        else:
+            dates = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        return dates if order == "ASC" else dates[::-1]
+
+
+class DateRangeHierarchyMixin:
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return DateRangeQuerySet(queryset.model, query=queryset.query, using=queryset.db)
+
+
+class LargeTableAdmin(DateRangeHierarchyMixin, admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_select_related = ("member",)
+    raw_id_fields = ("member",)
+    search_fields = ("member__phone",)
+    search_help_text = "Search by full phone number"
+
+    def get_search_results(self, request, queryset, search_term):
+        # An exact match can use Member.phone's unique index; the admin's
+        # own lookups are case-insensitive and scan the join instead
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(member__phone=search_term), False
+
+
+@admin.register(Member)
+class MemberAdmin(DateRangeHierarchyMixin, admin.ModelAdmin):
+    list_display = ("name", "phone", "start_date", "end_date", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("=phone", "name")
+    date_hierarchy = "end_date"
+    ordering = ("-id",)
+    show_full_result_count = False
+    actions = ("archive_members", "restore_members", "renew_members")
+
+    @admin.action(description="Archive selected members")
+    def archive_members(self, request, queryset):
+        updated = queryset.filter(is_active=True).update(is_active=False)
+        self.message_user(request, f"{updated} member(s) archived.")
+
+    @admin.action(description="Restore selected members")
+    def restore_members(self, request, queryset):
+        updated = queryset.filter(is_active=False).update(is_active=True)
+        self.message_user(request, f"{updated} member(s) restored.")
+
+    @admin.action(description="Renew selected members (paid today)")
+    def renew_members(self, request, queryset):
+        updated = queryset.filter(is_active=True).update(
+            end_date=renewal_end_date(timezone.localdate())
+        )
+        self.message_user(request, f"{updated} member(s) renewed.")
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(LargeTableAdmin):
+    list_display = ("member", "date", "created_at")
+    date_hierarchy = "date"
+    ordering = ("-date", "-id")
+
+
+@admin.register(Payment)
+class PaymentAdmin(LargeTableAdmin):
+    list_display = ("member", "amount", "paid_on")
+    date_hierarchy = "paid_on"
+    ordering = ("-paid_on", "-id")
+
+
+@admin.register(MemberEngagement)
+class MemberEngagementAdmin(admin.ModelAdmin):
+    list_display = (
+        "member",
+        "churn_risk",
+        "visits_30d",
+        "days_since_last_visit",
+        "streak_weeks",
+        "trend",
+        "scored_at",
+    )
+    list_select_related = ("member",)
+    search_fields = ("=member__phone",)
+    ordering = ("-churn_risk",)
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(GymConfig)
+class GymConfigAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "qr_active", "grace_days", "archive_after_days")
+
+
+@admin.register(ArchiveSweep)
+class ArchiveSweepAdmin(admin.ModelAdmin):
+    list_display = ("ran_at", "source", "expired_before", "archived_count")
+    list_filter = ("source",)
+    date_hierarchy = "ran_at"
+    readonly_fields = ("ran_at", "source", "expired_before", "archived_count", "member_ids")
+
+    def has_add_permission(self, request):
+        return False
 
-admin.site.register(Member)
-admin.site.register(Attendance)
-admin.site.register(Payment)
-admin.site.register(GymConfig)
+    def has_change_permission(self, request, obj=None):
+        return False
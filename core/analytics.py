@@ -0,0 +1,251 @@
+"""
+Member engagement metrics and churn-risk scoring.
+
+Attendance for every active member is pulled with two bulk ``values_list``
+queries and turned into NumPy arrays; all metrics are then computed column-wise
+so scoring cost grows with the number of attendance rows, not with a Python
+loop per member.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Attendance, Member, MemberEngagement
+from .utils import lapsed_before
+
+
+HISTORY_WEEKS = 52          # attendance window loaded for scoring
+TREND_WEEKS = 8             # weeks used for the visit-rate slope
+TARGET_VISITS_30D = 12      # ~3 visits a week counts as fully engaged
+RECENCY_HALF_LIFE_DAYS = 10
+STREAK_CAP_WEEKS = 8
+EXPIRY_HORIZON_DAYS = 30
+
+# Must sum to 1 so churn_risk stays within 0..1
+RISK_WEIGHTS = {
+    "recency": 0.35,
+    "frequency": 0.25,
+    "consistency": 0.10,
+    "decline": 0.10,
+    "expiry": 0.20,
+}
+
+
+def _day_numbers(dates):
+    # toordinal() is far cheaper than letting NumPy parse date objects
+    return np.fromiter(
+        (d.toordinal() for d in dates), dtype=np.int64, count=len(dates)
+    )
+
+
+def _align_visits(member_ids, visit_member):
+    """
+    Map each visit to its row in the sorted ``member_ids``.
+
+    Members and visits come from separate queries, so a member created or
+    restored in between can own visits with no row; those visits are
+    dropped rather than credited to a neighbour. Returns ``(rows, keep)``.
+    """
+    if not len(member_ids):
+        return np.zeros(0, dtype=np.int64), np.zeros(len(visit_member), dtype=bool)
+    rows = np.minimum(np.searchsorted(member_ids, visit_member), len(member_ids) - 1)
+    keep = member_ids[rows] == visit_member
+    return rows[keep], keep
+
+
+def load_activity(today=None, weeks=HISTORY_WEEKS):
+    """
+    Load active members and their attendance as aligned NumPy arrays.
+
+    Members already expired past their grace period are left out: they have
+    lapsed, not about to. ``visit_rows`` indexes into ``member_ids`` and
+    ``visit_age`` is the number of days before ``today`` each visit happened.
+    """
+    today = today or timezone.localdate()
+    today_num = today.toordinal()
+    cutoff = lapsed_before(today)
+
+    members = list(
+        Member.objects.filter(is_active=True, end_date__gte=cutoff)
+        .order_by("id")
+        .values_list("id", "start_date", "end_date")
+    )
+    ids, start_dates, end_dates = zip(*members) if members else ((), (), ())
+    member_ids = np.fromiter(ids, dtype=np.int64, count=len(members))
+    tenure = today_num - _day_numbers(start_dates)
+    days_to_expiry = _day_numbers(end_dates) - today_num
+
+    visits = list(
+        Attendance.objects.filter(
+            member__is_active=True,
+            member__end_date__gte=cutoff,
+            date__gt=today - timedelta(weeks=weeks),
+            date__lte=today,
+        ).values_list("member_id", "date")
+    )
+    visit_member, visit_dates = zip(*visits) if visits else ((), ())
+    visit_member = np.fromiter(visit_member, dtype=np.int64, count=len(visits))
+    visit_age = today_num - _day_numbers(visit_dates)
+    visit_rows, keep = _align_visits(member_ids, visit_member)
+
+    return {
+        "lapsed_before": cutoff,
+        "member_ids": member_ids,
+        "tenure": np.clip(tenure, 0, None),
+        "days_to_expiry": days_to_expiry,
+        "visit_rows": visit_rows,
+        "visit_age": visit_age[keep],
+        "weeks": weeks,
+    }
+
+
+def _leading_run(flags):
+    # Length of the run of True values starting at column 0, per row
+    return np.where(flags.all(axis=1), flags.shape[1], np.argmin(flags, axis=1))
+
+
+def compute_engagement(activity):
+    """
+    Return per-member frequency, recency, streak and trend arrays.
+    """
+    n = len(activity["member_ids"])
+    weeks = activity["weeks"]
+    rows = activity["visit_rows"]
+    age = activity["visit_age"]
+    tenure = activity["tenure"]
+
+    # (members x weeks) visit counts; column 0 is the 7 days ending today
+    weekly = np.bincount(
+        rows * weeks + age // 7, minlength=n * weeks
+    ).reshape(n, weeks)
+
+    visits_30d = np.bincount(rows[age < 30], minlength=n)
+
+    days_since_last_visit = np.full(n, weeks * 7, dtype=np.int64)
+    np.minimum.at(days_since_last_visit, rows, age)
+    has_visit = np.bincount(rows, minlength=n) > 0
+
+    # Consecutive weeks with at least one visit; an empty current week
+    # doesn't break the streak until it is over
+    attended = weekly > 0
+    streak_weeks = np.where(
+        attended[:, 0], _leading_run(attended), _leading_run(attended[:, 1:])
+    )
+
+    # Least-squares slope of weekly visits over the last TREND_WEEKS,
+    # ignoring weeks from before the member joined
+    k = np.arange(TREND_WEEKS)
+    x = -k.astype(float)
+    w = (7 * k[None, :] <= tenure[:, None]).astype(float)
+    x_mean = (w * x).sum(axis=1) / np.maximum(w.sum(axis=1), 1)
+    dx = (x[None, :] - x_mean[:, None]) * w
+    denom = (dx * dx).sum(axis=1)
+    trend = np.divide(
+        (dx * weekly[:, :TREND_WEEKS]).sum(axis=1),
+        denom,
+        out=np.zeros(n),
+        where=denom > 0,
+    )
+
+    return {
+        "member_ids": activity["member_ids"],
+        "tenure": tenure,
+        "days_to_expiry": activity["days_to_expiry"],
+        "visits_30d": visits_30d,
+        "days_since_last_visit": days_since_last_visit,
+        "has_visit": has_visit,
+        "streak_weeks": streak_weeks,
+        "trend": trend,
+    }
+
+
+def churn_risk(metrics):
+    """
+    Combine engagement metrics into a churn-risk score between 0 and 1.
+    """
+    tenure = metrics["tenure"]
+
+    # Never-visited members are judged on how long they've been members
+    idle_days = np.where(
+        metrics["has_visit"],
+        metrics["days_since_last_visit"],
+        np.minimum(tenure, metrics["days_since_last_visit"]),
+    )
+    expected_visits = TARGET_VISITS_30D * np.minimum(tenure + 1, 30) / 30
+
+    components = {
+        "recency": 1 - np.exp2(-idle_days / RECENCY_HALF_LIFE_DAYS),
+        "frequency": 1 - np.clip(
+            metrics["visits_30d"] / np.maximum(expected_visits, 1), 0, 1
+        ),
+        "consistency": 1 - np.minimum(metrics["streak_weeks"], STREAK_CAP_WEEKS)
+        / STREAK_CAP_WEEKS,
+        "decline": np.clip(-metrics["trend"], 0, 1),
+        "expiry": np.clip(
+            1 - metrics["days_to_expiry"] / EXPIRY_HORIZON_DAYS, 0, 1
+        ),
+    }
+    return sum(RISK_WEIGHTS[name] * value for name, value in components.items())
+
+
+def score_members(today=None):
+    """
+    Score every active, not yet lapsed member and upsert their
+    MemberEngagement rows.
+
+    Returns the number of members scored.
+    """
+    activity = load_activity(today)
+    metrics = compute_engagement(activity)
+    risk = np.round(churn_risk(metrics), 4)
+    scored_at = timezone.now()
+
+    last_visit = np.where(
+        metrics["has_visit"], metrics["days_since_last_visit"], -1
+    ).tolist()
+    rows = [
+        MemberEngagement(
+            member_id=member_id,
+            visits_30d=visits,
+            days_since_last_visit=idle if idle >= 0 else None,
+            streak_weeks=streak,
+            trend=trend,
+            churn_risk=score,
+            scored_at=scored_at,
+        )
+        for member_id, visits, idle, streak, trend, score in zip(
+            metrics["member_ids"].tolist(),
+            metrics["visits_30d"].tolist(),
+            last_visit,
+            metrics["streak_weeks"].tolist(),
+            np.round(metrics["trend"], 3).tolist(),
+            risk.tolist(),
+        )
+    ]
+
+    with transaction.atomic():
+        MemberEngagement.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["member"],
+            update_fields=[
+                "visits_30d",
+                "days_since_last_visit",
+                "streak_weeks",
+                "trend",
+                "churn_risk",
+                "scored_at",
+            ],
+        )
+        # Archived and lapsed members are no longer scored
+        MemberEngagement.objects.filter(
+            Q(member__is_active=False)
+            | Q(member__end_date__lt=activity["lapsed_before"])
+        ).delete()
+
+    return len(rows)
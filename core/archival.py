@@ -0,0 +1,72 @@
+"""
+Automatic archival of long-expired members.
+
+Members whose grace period ended more than ``days`` ago are soft-deleted
+(``is_active=False``) with one set-based UPDATE per chunk of ids instead of a
+``save()`` per member, and every run that archives anyone leaves an
+ArchiveSweep row listing the affected member ids.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchiveSweep, GymConfig, Member
+from .utils import lapsed_before
+
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 60
+CHUNK_SIZE = 1000
+
+
+def archive_after_days():
+    config = GymConfig.objects.first()
+    return config.archive_after_days if config else DEFAULT_ARCHIVE_AFTER_DAYS
+
+
+def archive_expired_members(
+    days=None, dry_run=False, source="command", chunk_size=CHUNK_SIZE
+):
+    """
+    Archive active members whose grace period ended more than ``days`` days
+    ago, so nobody still in grace is archived whatever ``days`` is.
+
+    Returns ``(expired_before, count, sweep)``; with ``dry_run`` nothing is
+    written, ``count`` is how many would be archived and ``sweep`` is None.
+    """
+    if days is None:
+        days = archive_after_days()
+    expired_before = lapsed_before(timezone.localdate()) - timedelta(days=days)
+    candidates = Member.objects.filter(is_active=True, end_date__lt=expired_before)
+
+    if dry_run:
+        return expired_before, candidates.count(), None
+
+    archived_ids = []
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Lock the chunk so the ids we record are exactly the rows updated
+            ids = list(
+                candidates.select_for_update()
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            Member.objects.filter(id__in=ids).update(is_active=False)
+        archived_ids += ids
+        last_id = ids[-1]
+
+    # Written once, rather than rewriting a growing id list every chunk
+    sweep = None
+    if archived_ids:
+        sweep = ArchiveSweep.objects.create(
+            source=source,
+            expired_before=expired_before,
+            archived_count=len(archived_ids),
+            member_ids=archived_ids,
+        )
+    return expired_before, len(archived_ids), sweep
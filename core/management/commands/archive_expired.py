@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archival import CHUNK_SIZE, archive_expired_members
+
+
+class Command(BaseCommand):
+    help = "Archive members whose grace period ended more than N days ago"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Days after the grace period before archiving (default: GymConfig.archive_after_days)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many members would be archived",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days must be 0 or more")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        expired_before, count, sweep = archive_expired_members(
+            days=options["days"],
+            dry_run=options["dry_run"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{count} member(s) expired before {expired_before} would be archived"
+            )
+            return
+
+        message = f"Archived {count} member(s) expired before {expired_before}"
+        if sweep:
+            message += f" (audit record #{sweep.id})"
+        self.stdout.write(self.style.SUCCESS(message))
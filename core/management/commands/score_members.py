@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.analytics import score_members
+
+
+class Command(BaseCommand):
+    help = "Recompute engagement metrics and churn-risk scores for active members"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        scored = score_members()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Scored {scored} active members in {elapsed:.2f}s")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Prime DB connections, gym config and the URL resolver"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-db",
+            action="store_true",
+            help="Skip the steps that touch the database",
+        )
+
+    def handle(self, *args, **options):
+        timings = warm_up(database=not options["no_db"])
+        for name, seconds in timings:
+            self.stdout.write(f"{name:<10} {seconds * 1000:8.1f} ms")
+        total = sum(seconds for _, seconds in timings)
+        self.stdout.write(self.style.SUCCESS(f"Warm-up done in {total * 1000:.1f} ms"))
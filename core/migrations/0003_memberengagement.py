@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_gymconfig'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('visits_30d', models.IntegerField(default=0)),
+                ('days_since_last_visit', models.IntegerField(blank=True, null=True)),
+                ('streak_weeks', models.IntegerField(default=0)),
+                ('trend', models.FloatField(default=0)),
+                ('churn_risk', models.FloatField(db_index=True, default=0)),
+                ('scored_at', models.DateTimeField()),
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to='core.member')),
+            ],
+        ),
+    ]
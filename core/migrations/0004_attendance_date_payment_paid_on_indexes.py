@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_memberengagement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='paid_on',
+            field=models.DateField(db_index=True),
+        ),
+    ]
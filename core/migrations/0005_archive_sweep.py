@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_attendance_date_payment_paid_on_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+                ('source', models.CharField(max_length=20)),
+                ('expired_before', models.DateField()),
+                ('archived_count', models.IntegerField(default=0)),
+                ('member_ids', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='gymconfig',
+            name='archive_after_days',
+            field=models.IntegerField(default=60),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date'], name='member_active_end_date_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:23
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_archive_sweep'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gymconfig',
+            name='archive_after_days',
+            field=models.IntegerField(default=60, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
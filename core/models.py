@@ -1,3 +1,4 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 from datetime import date, timedelta
 
@@ -13,12 +14,22 @@ class Member(models.Model):
     is_active = models.BooleanField(default=True)  # soft delete
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Dashboards and sweeps only ever look at active members by expiry
+            models.Index(
+                fields=["end_date"],
+                condition=models.Q(is_active=True),
+                name="member_active_end_date_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.phone}"
 
 class Attendance(models.Model):
     member = models.ForeignKey(Member, on_delete=models.CASCADE)
-    date = models.DateField()
+    date = models.DateField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -29,7 +40,7 @@ class Attendance(models.Model):
 
 class Payment(models.Model):
     member = models.ForeignKey(Member, on_delete=models.CASCADE)
-    paid_on = models.DateField()
+    paid_on = models.DateField(db_index=True)
     amount = models.DecimalField(max_digits=8, decimal_places=2)
 
     def __str__(self):
@@ -38,6 +49,9 @@ class Payment(models.Model):
 class GymConfig(models.Model):
     qr_active = models.BooleanField(default=True)
     grace_days = models.IntegerField(default=4)
+    archive_after_days = models.IntegerField(
+        default=60, validators=[MinValueValidator(0)]
+    )  # this long past the grace period -> archived
 
     def save(self, *args, **kwargs):
         if not self.pk and GymConfig.objects.exists():
@@ -47,3 +61,29 @@ class GymConfig(models.Model):
     def __str__(self):
         return "Gym Config"
 
+
+class MemberEngagement(models.Model):
+    # Derived signals, rewritten in bulk by core.analytics.score_members()
+    member = models.OneToOneField(
+        Member, on_delete=models.CASCADE, related_name="engagement"
+    )
+    visits_30d = models.IntegerField(default=0)
+    days_since_last_visit = models.IntegerField(null=True, blank=True)
+    streak_weeks = models.IntegerField(default=0)
+    trend = models.FloatField(default=0)  # visits/week change per week
+    churn_risk = models.FloatField(default=0, db_index=True)  # 0 (safe) .. 1
+    scored_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.member_id} - {self.churn_risk:.2f}"
+
+class ArchiveSweep(models.Model):
+    # Audit trail of automatic archival runs (see core.archival)
+    ran_at = models.DateTimeField(auto_now_add=True)
+    source = models.CharField(max_length=20)  # "command" or "api"
+    expired_before = models.DateField()
+    archived_count = models.IntegerField(default=0)
+    member_ids = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"{self.ran_at:%Y-%m-%d %H:%M} - {self.archived_count} archived"
@@ -46,3 +46,10 @@ class MemberUpdateSerializer(serializers.ModelSerializer):
 # =========================
 class MemberRenewSerializer(serializers.Serializer):
     payment_date = serializers.DateField()
+
+# =========================
+# #ARCHIVE_EXPIRED_MEMBERS
+# =========================
+class ArchiveExpiredSerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=0, required=False)
+    dry_run = serializers.BooleanField(default=False)
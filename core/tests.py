@@ -1,3 +1,469 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import numpy as np
+from rest_framework.test import APIClient
+
+from .admin import DateRangeQuerySet, EstimatedCountPaginator, MemberAdmin
+from .analytics import _align_visits, churn_risk, compute_engagement, score_members
+from .archival import archive_expired_members
+from .models import ArchiveSweep, Attendance, GymConfig, Member, MemberEngagement
+from .throttling import LocalStore, client_ip, local_store, take_token
+from .utils import renewal_end_date
+
+MARK_URL = "/api/attendance/mark/"
+NOON = timezone.make_aware(datetime(2026, 1, 5, 12, 0))
+
+
+class EngagementTests(TestCase):
+    def test_compute_engagement_hand_checked(self):
+        metrics = compute_engagement({
+            "member_ids": np.array([10, 20]),
+            "tenure": np.array([100, 3]),
+            "days_to_expiry": np.array([5, 30]),
+            "visit_rows": np.array([0, 0, 0]),
+            "visit_age": np.array([0, 7, 14]),
+            "weeks": 52,
+        })
+
+        self.assertEqual(metrics["visits_30d"].tolist(), [3, 0])
+        self.assertEqual(metrics["has_visit"].tolist(), [True, False])
+        self.assertEqual(metrics["days_since_last_visit"][0], 0)
+        self.assertEqual(metrics["streak_weeks"].tolist(), [3, 0])
+        # Weekly counts [1, 1, 1, 0, 0, 0, 0, 0] against x = 0..-7: 7.5 / 42
+        self.assertAlmostEqual(metrics["trend"][0], 7.5 / 42)
+        # Only one week since joining, so no slope
+        self.assertEqual(metrics["trend"][1], 0)
+
+    def test_compute_engagement_no_members(self):
+        metrics = compute_engagement({
+            "member_ids": np.zeros(0, dtype=np.int64),
+            "tenure": np.zeros(0, dtype=np.int64),
+            "days_to_expiry": np.zeros(0, dtype=np.int64),
+            "visit_rows": np.zeros(0, dtype=np.int64),
+            "visit_age": np.zeros(0, dtype=np.int64),
+            "weeks": 52,
+        })
+
+        for name in ("visits_30d", "streak_weeks", "trend"):
+            self.assertEqual(len(metrics[name]), 0)
+
+    def test_visits_of_unknown_members_are_dropped(self):
+        # 15 falls between two members, 99 past the last one
+        rows, keep = _align_visits(np.array([10, 20]), np.array([20, 15, 10, 99]))
+
+        self.assertEqual(rows.tolist(), [1, 0])
+        self.assertEqual(keep.tolist(), [True, False, True, False])
+
+    def test_visits_without_any_members(self):
+        rows, keep = _align_visits(np.zeros(0, dtype=np.int64), np.array([5]))
+
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(keep.tolist(), [False])
+
+
+    def test_engaged_member_scores_lower_than_idle(self):
+        # Same tenure and expiry; member 1 visits every few days, 2 stopped
+        risk = churn_risk(compute_engagement({
+            "member_ids": np.array([1, 2]),
+            "tenure": np.array([120, 120]),
+            "days_to_expiry": np.array([20, 20]),
+            "visit_rows": np.array([0] * 10 + [1] * 3),
+            "visit_age": np.array(list(range(0, 30, 3)) + [40, 45, 50]),
+            "weeks": 52,
+        }))
+
+        self.assertLess(risk[0], risk[1])
+        self.assertTrue(((0 <= risk) & (risk <= 1)).all())
+
+
+class ScoreMembersTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.regular = self.member("Regular", "9200000001", days_left=20)
+        self.idle = self.member("Idle", "9200000002", days_left=3)
+        for days_ago in range(0, 28, 3):
+            Attendance.objects.create(
+                member=self.regular, date=self.today - timedelta(days=days_ago)
+            )
+
+    def member(self, name, phone, days_left):
+        return Member.objects.create(
+            name=name, phone=phone,
+            start_date=self.today - timedelta(days=120),
+            end_date=self.today + timedelta(days=days_left),
+        )
+
+    def test_upserts_one_row_per_member(self):
+        self.assertEqual(score_members(), 2)
+        self.assertEqual(score_members(), 2)
+
+        self.assertEqual(MemberEngagement.objects.count(), 2)
+        regular = MemberEngagement.objects.get(member=self.regular)
+        self.assertEqual(regular.visits_30d, 10)
+        self.assertLess(
+            regular.churn_risk, MemberEngagement.objects.get(member=self.idle).churn_risk
+        )
+
+    def test_archived_and_lapsed_members_lose_their_rows(self):
+        lapsed = self.member("Lapsed", "9200000003", days_left=-30)
+        score_members()
+        self.assertFalse(MemberEngagement.objects.filter(member=lapsed).exists())
+
+        Member.objects.filter(id=self.idle.id).update(is_active=False)
+        self.assertEqual(score_members(), 1)
+        self.assertEqual(
+            list(MemberEngagement.objects.values_list("member_id", flat=True)),
+            [self.regular.id],
+        )
+
+
+class AtRiskMembersViewTests(TestCase):
+    URL = "/api/members/at-risk/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("owner"))
+        today = timezone.localdate()
+        # The last member expired a month ago and keeps a stale score
+        scored = ((10, 0.9), (10, 0.6), (10, 0.2), (-30, 0.95))
+        for i, (days_left, risk) in enumerate(scored):
+            member = Member.objects.create(
+                name=f"Member {i}", phone=f"930000000{i}",
+                start_date=today - timedelta(days=60),
+                end_date=today + timedelta(days=days_left),
+            )
+            MemberEngagement.objects.create(
+                member=member, visits_30d=0, streak_weeks=0, trend=0,
+                churn_risk=risk, scored_at=timezone.now(),
+            )
+
+    def test_filters_and_orders_by_risk(self):
+        response = self.client.get(self.URL, {"min_risk": 0.5})
+
+        self.assertEqual(response.status_code, 200)
+        # The lapsed member's stale 0.95 is left out
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            [m["churn_risk"] for m in response.data["members"]], [0.9, 0.6]
+        )
+
+    def test_limit(self):
+        response = self.client.get(self.URL, {"min_risk": 0, "limit": 1})
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["members"]), 1)
+
+    def test_bad_parameters(self):
+        for params in ({"limit": "ten"}, {"min_risk": "high"}):
+            self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+
+class TokenBucketTests(TestCase):
+    def test_burst_then_rejected(self):
+        store = LocalStore()
+        for _ in range(3):
+            self.assertEqual(take_token(store, "k", 3, 1.0, now=30.0), 0)
+
+        self.assertEqual(take_token(store, "k", 3, 1.0, now=30.0), 3.0)
+
+    def test_refills_over_time(self):
+        store = LocalStore()
+        for _ in range(3):
+            take_token(store, "k", 3, 1.0, now=30.0)
+
+        # A third of the previous window has slid out: one token back
+        self.assertEqual(take_token(store, "k", 3, 1.0, now=34.0), 0)
+        self.assertGreater(take_token(store, "k", 3, 1.0, now=34.0), 0)
+        # Previous window fully slid out
+        self.assertEqual(take_token(store, "k", 3, 1.0, now=36.0), 0)
+
+
+class CheckInThrottleTests(TestCase):
+    def setUp(self):
+        local_store.clear()
+
+    def mark(self, last_4="0000", **extra):
+        return self.client.post(
+            MARK_URL, {"last_4_digits": last_4}, content_type="application/json",
+            **extra,
+        )
+
+    @mock.patch("core.throttling.IP_BURST", 2)
+    def test_rejected_request_runs_no_queries(self):
+        self.mark()
+        self.mark()
+
+        with self.assertNumQueries(0):
+            response = self.mark()
+        self.assertEqual(response.status_code, 429)
+
+    @mock.patch("core.throttling.DEVICE_BURST", 1)
+    def test_device_limit_needs_device_header(self):
+        # Same User-Agent, e.g. two phones of the same model on gym wifi
+        self.mark(HTTP_USER_AGENT="Phone")
+        self.assertNotEqual(self.mark(HTTP_USER_AGENT="Phone").status_code, 429)
+
+        self.mark(HTTP_X_DEVICE_ID="kiosk")
+        self.assertEqual(self.mark(HTTP_X_DEVICE_ID="kiosk").status_code, 429)
+
+    def test_stuck_kiosk_leaves_ip_limit_to_others(self):
+        for _ in range(70):
+            self.mark(REMOTE_ADDR="10.9.9.9", HTTP_X_DEVICE_ID="kiosk")
+
+        response = self.mark(REMOTE_ADDR="10.9.9.9", HTTP_X_DEVICE_ID="phone")
+        self.assertNotEqual(response.status_code, 429)
+
+
+class ClientIpTests(TestCase):
+    def ip(self, remote_addr, forwarded=None):
+        extra = {"HTTP_X_FORWARDED_FOR": forwarded} if forwarded else {}
+        return client_ip(RequestFactory().post(MARK_URL, REMOTE_ADDR=remote_addr, **extra))
+
+    def test_forwarded_for_trusted_from_private_proxy(self):
+        self.assertEqual(self.ip("10.1.2.3", "1.1.1.1, 203.0.113.7"), "203.0.113.7")
+        self.assertEqual(self.ip("10.1.2.3"), "10.1.2.3")
+
+    def test_forwarded_for_ignored_from_public_client(self):
+        self.assertEqual(self.ip("34.120.1.4", "203.0.113.7"), "34.120.1.4")
+
+    @override_settings(REST_FRAMEWORK={"NUM_PROXIES": 0})
+    def test_num_proxies_setting_wins(self):
+        self.assertEqual(self.ip("10.1.2.3", "203.0.113.7"), "10.1.2.3")
+
+
+@mock.patch("core.views.timezone.localtime", return_value=NOON)
+class CheckInLockoutTests(TestCase):
+    def setUp(self):
+        local_store.clear()
+        GymConfig.objects.create(qr_active=True)
+        today = NOON.date()
+        Member.objects.create(
+            name="Asha", phone="9800001234",
+            start_date=today, end_date=today + timedelta(days=30),
+        )
+
+    def mark(self, last_4, ip="10.0.0.1", device="phone"):
+        return self.client.post(
+            MARK_URL, {"last_4_digits": last_4}, content_type="application/json",
+            REMOTE_ADDR=ip, HTTP_X_DEVICE_ID=device,
+        )
+
+    def test_client_locked_after_failed_lookups(self, _):
+        for _ in range(5):
+            self.assertEqual(self.mark("0000").status_code, 404)
+
+        with self.assertNumQueries(0):
+            response = self.mark("1234")
+        self.assertEqual(response.status_code, 429)
+
+    def test_member_suffix_is_never_locked(self, _):
+        for _ in range(5):
+            self.mark("1234", ip="10.0.0.66")
+        for _ in range(5):
+            self.mark("0000", ip="10.0.0.66")
+
+        self.assertEqual(self.mark("1234", ip="10.0.0.66").status_code, 429)
+        # Another client can still use the member's digits
+        self.assertEqual(self.mark("1234").status_code, 200)
+
+    def test_rotating_device_id_locks_the_ip(self, _):
+        statuses = [
+            self.mark(f"{n:04d}", ip="10.0.0.99", device=f"bot-{n}").status_code
+            for n in range(21)
+        ]
+
+        self.assertEqual(statuses[:20], [404] * 20)
+        self.assertEqual(statuses[20], 429)
+
+
+class ArchiveExpiredTests(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        # Five long expired, one expired recently, one still running
+        self.expired_ids = [
+            Member.objects.create(
+                name=f"Old {i}", phone=f"90000000{i:02d}",
+                start_date=today - timedelta(days=200),
+                end_date=today - timedelta(days=100),
+            ).id
+            for i in range(5)
+        ]
+        for i, end_date in enumerate((today - timedelta(days=10), today)):
+            Member.objects.create(
+                name=f"Current {i}", phone=f"91000000{i:02d}",
+                start_date=today - timedelta(days=30), end_date=end_date,
+            )
+
+    def test_dry_run_writes_nothing(self):
+        _, count, sweep = archive_expired_members(days=60, dry_run=True)
+
+        self.assertEqual(count, 5)
+        self.assertIsNone(sweep)
+        self.assertEqual(Member.objects.filter(is_active=False).count(), 0)
+        self.assertFalse(ArchiveSweep.objects.exists())
+
+    def test_chunks_archive_every_member_once(self):
+        # 5 members in chunks of 2: the last chunk is partial
+        _, count, sweep = archive_expired_members(days=60, chunk_size=2)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(
+            sorted(Member.objects.filter(is_active=False).values_list("id", flat=True)),
+            self.expired_ids,
+        )
+        self.assertEqual(ArchiveSweep.objects.count(), 1)
+
+    def test_audit_row_matches_archived_members(self):
+        with CaptureQueriesContext(connection) as queries:
+            archive_expired_members(days=60, chunk_size=2)
+
+        sweep_writes = [
+            q for q in queries.captured_queries if "core_archivesweep" in q["sql"]
+        ]
+        self.assertEqual(len(sweep_writes), 1)
+        sweep = ArchiveSweep.objects.get()
+        self.assertEqual(sweep.member_ids, self.expired_ids)
+        self.assertEqual(sweep.archived_count, len(self.expired_ids))
+
+    def test_members_in_grace_are_never_archived(self):
+        # Expired 10 days ago: past the 4 grace days, unlike yesterday's
+        today = timezone.localdate()
+        in_grace = Member.objects.create(
+            name="Grace", phone="9100000099",
+            start_date=today - timedelta(days=31), end_date=today - timedelta(days=1),
+        )
+
+        _, count, sweep = archive_expired_members(days=0)
+
+        self.assertEqual(count, 6)
+        self.assertNotIn(in_grace.id, sweep.member_ids)
+        self.assertTrue(Member.objects.get(id=in_grace.id).is_active)
+
+    def test_nothing_to_archive_leaves_no_audit_row(self):
+        _, count, sweep = archive_expired_members(days=365)
+
+        self.assertEqual(count, 0)
+        self.assertIsNone(sweep)
+        self.assertFalse(ArchiveSweep.objects.exists())
+
+    def test_command_rejects_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_expired", days=-1)
+        with self.assertRaises(CommandError):
+            call_command("archive_expired", chunk_size=0)
+        self.assertEqual(Member.objects.filter(is_active=False).count(), 0)
+
+
+class RenewalTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("owner"))
+        self.end_date = date(2026, 3, 1)
+
+    def test_bulk_renewal_matches_renew_view(self):
+        for gap in (-5, 0, 15, 16):
+            payment_date = self.end_date + timedelta(days=gap)
+            via_view, via_update = (
+                Member.objects.create(
+                    name="Renewing", phone=f"94{gap + 10:02d}00000{n}",
+                    start_date=date(2026, 1, 30), end_date=self.end_date,
+                )
+                for n in range(2)
+            )
+
+            response = self.client.post(
+                f"/api/members/{via_view.id}/renew/",
+                {"payment_date": payment_date.isoformat()},
+            )
+            Member.objects.filter(id=via_update.id).update(
+                end_date=renewal_end_date(payment_date)
+            )
+
+            self.assertEqual(response.status_code, 200)
+            via_view.refresh_from_db()
+            via_update.refresh_from_db()
+            self.assertEqual(via_update.end_date, via_view.end_date, f"gap {gap}")
+
+
+@mock.patch.object(MemberAdmin, "message_user")
+class MemberAdminActionTests(TestCase):
+    def setUp(self):
+        self.admin = MemberAdmin(Member, admin.site)
+        today = timezone.localdate()
+        for i in range(3):
+            Member.objects.create(
+                name=f"Member {i}", phone=f"950000000{i}",
+                start_date=today, end_date=today + timedelta(days=30),
+                is_active=i != 0,
+            )
+
+    def test_each_action_is_one_update(self, _):
+        for action in ("archive_members", "restore_members", "renew_members"):
+            with self.assertNumQueries(1):
+                getattr(self.admin, action)(None, Member.objects.all())
+
+    def test_archive_and_restore(self, message_user):
+        self.admin.archive_members(None, Member.objects.all())
+        self.assertFalse(Member.objects.filter(is_active=True).exists())
+        message_user.assert_called_with(None, "2 member(s) archived.")
+
+        self.admin.restore_members(None, Member.objects.all())
+        self.assertEqual(Member.objects.filter(is_active=True).count(), 3)
+
+    def test_renew_extends_active_members_only(self, _):
+        before = dict(Member.objects.values_list("id", "end_date"))
+
+        self.admin.renew_members(None, Member.objects.all())
+
+        for member in Member.objects.all():
+            extended = before[member.id] + timedelta(days=30)
+            self.assertEqual(
+                member.end_date, extended if member.is_active else before[member.id]
+            )
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        member = Member.objects.create(
+            name="Member", phone="9600000000",
+            start_date=date(2024, 12, 1), end_date=date(2025, 4, 1),
+        )
+        for day in (date(2024, 12, 30), date(2025, 1, 2), date(2025, 3, 1)):
+            Attendance.objects.create(member=member, date=day)
+        self.queryset = DateRangeQuerySet(Attendance)
+
+    def test_dates_by_year(self):
+        self.assertEqual(
+            self.queryset.dates("date", "year"), [date(2024, 1, 1), date(2025, 1, 1)]
+        )
+
+    def test_dates_by_month(self):
+        # Months without rows in between are listed too
+        self.assertEqual(
+            self.queryset.dates("date", "month"),
+            [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)],
+        )
+
+    def test_dates_by_day(self):
+        days = self.queryset.dates("date", "day", order="DESC")
+
+        self.assertEqual(len(days), 62)
+        self.assertEqual((days[0], days[-1]), (date(2025, 3, 1), date(2024, 12, 30)))
+
+    def test_dates_of_empty_queryset(self):
+        self.assertEqual(self.queryset.none().dates("date", "month"), [])
+
+    def test_paginator_counts_exactly_off_postgres(self):
+        paginator = EstimatedCountPaginator(Attendance.objects.order_by("id"), 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
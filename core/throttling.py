@@ -0,0 +1,244 @@
+"""
+Throttling for the public QR check-in endpoint.
+
+A rate limit per client IP keeps one network or script from starving
+everyone else, with a tighter one per device for clients that send an
+``X-Device-Id`` header; requests the device limit rejects don't use up the
+IP's share. Clients, and whole IPs, that keep entering ``last_4_digits``
+that match no member are locked out for a while, which bounds enumeration
+without ever locking a real member's suffix. All state lives in the shared Django
+cache when one is configured (e.g. Redis via ``REDIS_URL``) and in a small
+per-process store otherwise, and is only written with ``add``/``incr`` so
+concurrent workers can't lose each other's updates. A rejected request never
+touches the database.
+"""
+
+import hashlib
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+# Shared by everyone behind one IP (gym wifi, a kiosk's network)
+IP_BURST = 60
+IP_REFILL_PER_SEC = 1.0
+
+# One phone / kiosk browser, only when it sends X-Device-Id
+DEVICE_BURST = 10
+DEVICE_REFILL_PER_SEC = 1 / 6
+
+# Failed lookups (no member / ambiguous) before the client, or its whole IP,
+# is locked. The IP limit stops enumeration with a new device id per request
+FAILED_LOOKUP_MAX = 5
+FAILED_LOOKUP_IP_MAX = 20
+FAILED_LOOKUP_WINDOW_SECONDS = 5 * 60
+FAILED_LOOKUP_LOCKOUT_SECONDS = 15 * 60
+
+
+class LocalStore:
+    """
+    Per-process fallback with the subset of the cache API used here.
+
+    Bounded LRU, so a flood of distinct keys can't grow memory without limit.
+    """
+
+    def __init__(self, max_keys=10_000):
+        self.max_keys = max_keys
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._live(key, time.time())
+            return default if item is None else item[0]
+
+    def _set(self, key, value, timeout):
+        self._data[key] = (value, time.time() + timeout)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._set(key, value, timeout)
+
+    def add(self, key, value, timeout):
+        with self._lock:
+            if self._live(key, time.time()) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            item = self._live(key, time.time())
+            if item is None:
+                raise ValueError(f"Key '{key}' not found")
+            self._data[key] = (item[0] + delta, item[1])
+            return item[0] + delta
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_store = LocalStore()
+
+
+def get_store():
+    # Django falls back to a LocMemCache, which is per-process anyway;
+    # only use the cache when it is actually shared between workers
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend.endswith(("LocMemCache", "DummyCache")):
+        return local_store
+    return cache
+
+
+def _key(*parts):
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return f"checkin:{parts[0]}:{digest}"
+
+
+def _count(store, key, timeout):
+    # add() + incr() are each atomic, unlike get() followed by set()
+    store.add(key, 0, timeout)
+    try:
+        return store.incr(key)
+    except ValueError:  # expired between add() and incr()
+        store.add(key, 1, timeout)
+        return 1
+
+
+def take_token(store, key, burst, refill_per_sec, now=None):
+    """
+    Count one request; return 0 if allowed, else seconds to wait.
+
+    Allows ``burst`` requests per ``burst / refill_per_sec`` seconds as a
+    sliding window: the previous window's count is weighted by how much of
+    it still overlaps, so capacity comes back gradually like a token bucket.
+    Rejected requests count too, so a client that keeps flooding stays
+    rejected.
+    """
+    now = time.time() if now is None else now
+    period = burst / refill_per_sec
+    window, elapsed = divmod(now, period)
+    window = int(window)
+
+    previous = store.get(f"{key}:{window - 1}", 0)
+    current = _count(store, f"{key}:{window}", int(2 * period) + 1)
+    if previous * (1 - elapsed / period) + current <= burst:
+        return 0
+
+    if current > burst:
+        return period - elapsed
+    # Wait until enough of the previous window has slid out
+    return period * (1 - (burst - current) / previous) - elapsed
+
+
+def client_ip(request):
+    """
+    Return the client IP.
+
+    With ``NUM_PROXIES`` set this is DRF's ``get_ident``. Unset, the last
+    ``X-Forwarded-For`` hop is trusted only when the request itself comes
+    from a private address, i.e. a hosting platform's load balancer; a
+    client connecting directly can't pick its own IP that way.
+    """
+    if api_settings.NUM_PROXIES is not None:
+        return BaseThrottle().get_ident(request) or ""
+
+    remote_addr = request.META.get("REMOTE_ADDR", "")
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    try:
+        behind_proxy = ipaddress.ip_address(remote_addr).is_private
+    except ValueError:
+        behind_proxy = False
+    if forwarded and behind_proxy:
+        return forwarded.split(",")[-1].strip()
+    return remote_addr
+
+
+def client_ident(request):
+    """
+    Return ``(ip, device)`` for a check-in request; ``device`` is the
+    ``X-Device-Id`` header, or ``""`` when the client doesn't send one.
+    """
+    return client_ip(request), request.META.get("HTTP_X_DEVICE_ID", "")
+
+
+def _lockout_keys(request):
+    ip, device = client_ident(request)
+    # Without X-Device-Id the User-Agent is the best hint at the device
+    device = device or request.META.get("HTTP_USER_AGENT", "")
+    return (
+        (_key("lock", ip, device), _key("failed", ip, device), FAILED_LOOKUP_MAX),
+        (_key("lock-ip", ip), _key("failed-ip", ip), FAILED_LOOKUP_IP_MAX),
+    )
+
+
+def client_locked_out(request):
+    """
+    Return True while this client or its IP is locked out for failed lookups.
+    """
+    store = get_store()
+    return any(store.get(lock_key) for lock_key, _, _ in _lockout_keys(request))
+
+
+def record_failed_lookup(request):
+    """
+    Count a lookup that matched no single member. The client (IP + device)
+    is locked once it reaches ``FAILED_LOOKUP_MAX`` within the window, and
+    its IP once all devices together reach ``FAILED_LOOKUP_IP_MAX``.
+
+    Only clients are locked, never the suffix, so nobody can lock a real
+    member out of check-in by guessing their digits.
+    """
+    store = get_store()
+    for lock_key, count_key, limit in _lockout_keys(request):
+        if _count(store, count_key, FAILED_LOOKUP_WINDOW_SECONDS) >= limit:
+            store.set(lock_key, True, FAILED_LOOKUP_LOCKOUT_SECONDS)
+
+
+class CheckInThrottle(BaseThrottle):
+    """
+    Rate limits keyed by client IP and, when ``X-Device-Id`` is sent, by
+    IP + device.
+
+    No device limit applies without the header: the User-Agent is shared
+    by many phones on the same gym wifi. The device limit is checked first,
+    so a kiosk stuck in a retry loop is stopped there and doesn't use up
+    the IP limit shared with the members' phones.
+    """
+
+    def allow_request(self, request, view):
+        store = get_store()
+        ip, device = client_ident(request)
+
+        self.wait_seconds = 0
+        if device:
+            self.wait_seconds = take_token(
+                store, _key("device", ip, device), DEVICE_BURST, DEVICE_REFILL_PER_SEC
+            )
+        if not self.wait_seconds:
+            self.wait_seconds = take_token(
+                store, _key("ip", ip), IP_BURST, IP_REFILL_PER_SEC
+            )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
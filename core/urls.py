@@ -8,7 +8,9 @@ from .views import (
     MarkAttendanceView,
     RestoreMemberView,
     PermanentDeleteMemberView,
-    MemberAttendanceHistoryView
+    MemberAttendanceHistoryView,
+    AtRiskMembersView,
+    ArchiveExpiredMembersView,
 )
 
 
@@ -16,6 +18,8 @@ urlpatterns = [
     path('members/', MembersView.as_view()),          # GET, POST
     path('members/<int:id>/', MembersView.as_view()), # DELETE (SOFT)
     path('members/archived/', ArchivedMembersView.as_view()),
+    path('members/at-risk/', AtRiskMembersView.as_view()),  # GET, POST (rescore)
+    path('members/archive-expired/', ArchiveExpiredMembersView.as_view()),  # POST
     path('members/<int:id>/restore/', RestoreMemberView.as_view()),
     path('members/<int:id>/permanent-delete/', PermanentDeleteMemberView.as_view()),
 
@@ -1,5 +1,22 @@
 from datetime import date, timedelta
 
+from django.db.models import Case, DateField, ExpressionWrapper, F, Value, When
+
+from .models import GymConfig
+
+MEMBERSHIP_DAYS = 30
+FRESH_START_GAP_DAYS = 15
+DEFAULT_GRACE_DAYS = 4
+
+def get_grace_days():
+    config = GymConfig.objects.first()
+    return config.grace_days if config else DEFAULT_GRACE_DAYS
+
+def lapsed_before(today):
+    # Members whose membership ended before this date are past their grace
+    # period ("expired" in get_member_status)
+    return today - timedelta(days=get_grace_days())
+
 def get_member_status(member, grace_days=4):
     today = date.today()
     grace = timedelta(days=grace_days)
@@ -10,3 +27,19 @@ def get_member_status(member, grace_days=4):
         return "grace", "orange"
     else:
         return "expired", "red"
+
+def renewal_end_date(payment_date):
+    # Same rule as RenewMemberView, as a DB expression so a whole queryset
+    # can be renewed in one UPDATE: more than FRESH_START_GAP_DAYS late
+    # starts a fresh cycle, otherwise the old expiry is extended
+    return Case(
+        When(
+            end_date__lt=payment_date - timedelta(days=FRESH_START_GAP_DAYS),
+            then=Value(payment_date + timedelta(days=MEMBERSHIP_DAYS)),
+        ),
+        default=ExpressionWrapper(
+            F("end_date") + timedelta(days=MEMBERSHIP_DAYS),
+            output_field=DateField(),
+        ),
+        output_field=DateField(),
+    )
@@ -7,14 +7,22 @@ from datetime import timedelta, date, time
 from django.utils import timezone
 from django.db.models.functions import TruncDate
 
-from .models import Member, GymConfig, Attendance
+from .models import Member, GymConfig, Attendance, MemberEngagement
 from .serializers import (
     MemberCreateSerializer,
     MemberUpdateSerializer,
     MemberRenewSerializer,
     AttendanceMarkSerializer,
+    ArchiveExpiredSerializer,
 )
-from .utils import get_member_status
+from .utils import (
+    FRESH_START_GAP_DAYS,
+    MEMBERSHIP_DAYS,
+    get_member_status,
+    lapsed_before,
+)
+from .archival import archive_expired_members
+from .throttling import CheckInThrottle, client_locked_out, record_failed_lookup
 
 
 # BASE OWNER VIEW
@@ -23,11 +31,20 @@ class OwnerAPIView(APIView):
 
 # QR ATTENDANCE (PUBLIC)
 class MarkAttendanceView(APIView):
+    authentication_classes = []
+    throttle_classes = [CheckInThrottle]
+
     def post(self, request):
         serializer = AttendanceMarkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         last_4 = serializer.validated_data["last_4_digits"]
 
+        # Checked before any query, so a locked-out client never reaches the DB
+        if client_locked_out(request):
+            return Response(
+                {"message": "Too many attempts. Try again later."}, status=429
+            )
+
         config = GymConfig.objects.first()
         if not config or not config.qr_active:
             return Response({"message": "QR attendance disabled"}, status=403)
@@ -39,15 +56,20 @@ class MarkAttendanceView(APIView):
                 status=403,
             )
 
-        members = Member.objects.filter(phone__endswith=last_4, is_active=True)
-        if not members.exists():
+        # Two rows are enough to tell "none", "one" and "ambiguous" apart
+        members = list(
+            Member.objects.filter(phone__endswith=last_4, is_active=True)[:2]
+        )
+        if not members:
+            record_failed_lookup(request)
             return Response({"message": "Member not found"}, status=404)
-        if members.count() > 1:
+        if len(members) > 1:
+            record_failed_lookup(request)
             return Response(
                 {"message": "Multiple members found. Contact owner."}, status=400
             )
 
-        member = members.first()
+        member = members[0]
         today = timezone.localdate()
 
         attendance, created = Attendance.objects.get_or_create(
@@ -157,17 +179,17 @@ class RenewMemberView(OwnerAPIView):
         gap_days = (payment_date - last_expiry).days
 
         # 🔴 RULE: Large gap → START FRESH
-        if gap_days > 15:
-            new_end_date = payment_date + timedelta(days=30)
+        if gap_days > FRESH_START_GAP_DAYS:
+            new_end_date = payment_date + timedelta(days=MEMBERSHIP_DAYS)
 
         # 🟡 RULE: Small gap / within grace → EXTEND
         else:
             # If expired but within grace or short delay
             if payment_date > last_expiry:
-                new_end_date = last_expiry + timedelta(days=30)
+                new_end_date = last_expiry + timedelta(days=MEMBERSHIP_DAYS)
             else:
                 # Renewed early
-                new_end_date = last_expiry + timedelta(days=30)
+                new_end_date = last_expiry + timedelta(days=MEMBERSHIP_DAYS)
 
         member.end_date = new_end_date
         member.save()
@@ -243,6 +265,34 @@ class ArchivedMembersView(OwnerAPIView):
         )
 
 
+# AUTO-ARCHIVE LONG-EXPIRED MEMBERS
+class ArchiveExpiredMembersView(OwnerAPIView):
+    def post(self, request):
+        serializer = ArchiveExpiredSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data["dry_run"]
+
+        expired_before, count, sweep = archive_expired_members(
+            days=serializer.validated_data.get("days"),
+            dry_run=dry_run,
+            source="api",
+        )
+
+        return Response(
+            {
+                "message": (
+                    "Dry run, nothing archived" if dry_run
+                    else "Expired members archived successfully"
+                ),
+                "dry_run": dry_run,
+                "expired_before": expired_before,
+                "count": count,
+                "sweep_id": sweep.id if sweep else None,
+            },
+            status=200,
+        )
+
+
 class RestoreMemberView(OwnerAPIView):
     def post(self, request, id):
         try:
@@ -266,6 +316,54 @@ class PermanentDeleteMemberView(OwnerAPIView):
         return Response({"message": "Member permanently deleted"}, status=200)
 
 
+# AT-RISK MEMBERS (CHURN SCORE)
+class AtRiskMembersView(OwnerAPIView):
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 50))
+            min_risk = float(request.query_params.get("min_risk", 0.5))
+        except ValueError:
+            return Response({"message": "Invalid limit or min_risk"}, status=400)
+
+        # Scores of members who lapsed since the last run are stale
+        scores = MemberEngagement.objects.filter(
+            member__is_active=True,
+            member__end_date__gte=lapsed_before(timezone.localdate()),
+            churn_risk__gte=min_risk,
+        ).select_related("member")
+
+        return Response(
+            {
+                "count": scores.count(),
+                "members": [
+                    {
+                        "id": e.member.id,
+                        "name": e.member.name,
+                        "phone": e.member.phone,
+                        "end_date": e.member.end_date,
+                        "churn_risk": e.churn_risk,
+                        "visits_30d": e.visits_30d,
+                        "days_since_last_visit": e.days_since_last_visit,
+                        "streak_weeks": e.streak_weeks,
+                        "trend": e.trend,
+                        "scored_at": e.scored_at,
+                    }
+                    for e in scores.order_by("-churn_risk", "member_id")[:max(limit, 0)]
+                ],
+            },
+            status=200,
+        )
+
+    def post(self, request):
+        # Rescores everyone inside the request (seconds on large gyms);
+        # prefer the score_members command on a schedule there.
+        # Imported here so NumPy isn't loaded on every worker boot
+        from .analytics import score_members
+
+        scored = score_members()
+        return Response({"message": "Members scored", "scored": scored}, status=200)
+
+
 # ATTENDANCE HISTORY
 class MemberAttendanceHistoryView(APIView):
     permission_classes = [IsAuthenticated]
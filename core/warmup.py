@@ -0,0 +1,64 @@
+"""
+Startup warm-up.
+
+Pays the one-off costs of the first request (DB connection, config lookup,
+URL resolver population, DRF/simplejwt class loading) before a real request
+arrives. Used by ``manage.py warmup`` and by the gunicorn hooks in
+``gunicorn.conf.py``.
+"""
+
+import time
+
+from django.db import connections
+from django.urls import get_resolver, resolve
+
+from .models import GymConfig
+
+
+def _prime_database():
+    for conn in connections.all():
+        conn.ensure_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def _prime_config():
+    GymConfig.objects.first()
+
+
+def _prime_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict  # forces the resolver to populate its lookup tables
+    resolve("/api/attendance/mark/")
+
+
+def _prime_api():
+    from rest_framework.settings import api_settings
+
+    for auth_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        auth_class()
+    api_settings.DEFAULT_RENDERER_CLASSES
+    api_settings.DEFAULT_PARSER_CLASSES
+    api_settings.DEFAULT_PERMISSION_CLASSES
+
+
+def warm_up(database=True, in_process=True):
+    """
+    Run each warm-up step and return a list of ``(step, seconds)``.
+
+    ``database`` covers the DB connection and gym config, ``in_process`` the
+    URL resolver and DRF/simplejwt classes. The gunicorn master primes only
+    the latter before forking; each worker then only needs the former.
+    """
+    steps = []
+    if database:
+        steps += [("database", _prime_database), ("config", _prime_config)]
+    if in_process:
+        steps += [("urls", _prime_urls), ("api", _prime_api)]
+
+    timings = []
+    for name, prime in steps:
+        started = time.perf_counter()
+        prime()
+        timings.append((name, time.perf_counter() - started))
+    return timings
@@ -0,0 +1,45 @@
+"""
+Gunicorn settings for gym_backend.
+
+Gunicorn reads this file automatically when started from the project root:
+
+    gunicorn gym_backend.wsgi
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+# Import Django, DRF and the app once in the master; workers are forked
+# with everything already loaded instead of each paying the import cost.
+preload_app = True
+
+
+def when_ready(server):
+    from django.db import connections
+
+    from core.warmup import warm_up
+
+    # Resolver and DRF classes are primed once and inherited by every worker
+    for name, seconds in warm_up(database=False):
+        server.log.info("warmup %s: %.1f ms", name, seconds * 1000)
+
+    # A connection opened in the master must never be shared across forks
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from core.warmup import warm_up
+
+    # Each worker opens its own (persistent, CONN_MAX_AGE) DB connection
+    # before taking traffic, so the first check-in doesn't wait for it;
+    # the resolver and API classes were already primed in the master
+    try:
+        timings = warm_up(in_process=False)
+    except Exception:
+        worker.log.exception("warmup failed; first request will connect lazily")
+        return
+    for name, seconds in timings:
+        worker.log.info("warmup %s: %.1f ms", name, seconds * 1000)
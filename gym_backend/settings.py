@@ -39,6 +39,13 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # Proxies in front of gunicorn, used to find the client IP for check-in
+    # throttling. Unset: the last X-Forwarded-For hop is used only when the
+    # request comes from a private address (a platform load balancer).
+    # Set it to the real hop count, or 0 to always use REMOTE_ADDR
+    'NUM_PROXIES': (
+        int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None
+    ),
 }
 
 # =========================
@@ -93,6 +100,7 @@ if DATABASE_URL:
         "default": dj_database_url.parse(
             DATABASE_URL,
             conn_max_age=600,
+            conn_health_checks=True,  # drop connections that died while the host slept
             ssl_require=True,
         )
     }
@@ -104,6 +112,20 @@ else:
         }
     }
 
+# =========================
+# CACHE (SHARED CHECK-IN THROTTLE STATE)
+# =========================
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    # Needs the "redis" package
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
 # =========================
 # PASSWORD VALIDATION
 # =========================
@@ -159,6 +181,7 @@ CORS_ALLOW_HEADERS = [
     "origin",
     "x-csrftoken",
     "x-requested-with",
+    "x-device-id",
 ]
 
 CORS_ALLOW_METHODS = [